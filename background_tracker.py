@@ -1,24 +1,36 @@
 """
 Real-time Cumulative Market Tracker
-Polls APIs every 100ms for ultra-precise tracking
+Polls APIs every 100ms for ultra-precise tracking (profiles in tracker_config.py)
 """
+import os
 import time
 import requests
 import sqlite3
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-# Database path - Use Render persistent disk at /data
-if Path('/data').exists():
+from ladder_format import LadderRing, append_archive
+from tracker_config import TrackerConfig
+
+# Database path - Use Render persistent disk at /data (TRACKER_DB overrides, e.g. for load tests)
+if os.environ.get('TRACKER_DB'):
+    DB_PATH = Path(os.environ['TRACKER_DB'])
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+elif Path('/data').exists():
     DB_PATH = Path('/data') / 'tracker.db'
 else:
     DB_PATH = Path(__file__).parent / 'data' / 'tracker.db'
     DB_PATH.parent.mkdir(exist_ok=True)
 
 # API Configuration
-EVENTS_API = "https://api.d99exch.com/api/guest/event_list"
-ODDS_API = "https://odds.o99exch.com/ws/getMarketDataNew"
+EVENTS_API = os.environ.get('EVENTS_API', "https://api.d99exch.com/api/guest/event_list")
+ODDS_API = os.environ.get('ODDS_API', "https://odds.o99exch.com/ws/getMarketDataNew")
+# Optional market metadata endpoint for runner names, GET ?market_id=... returning
+# a runners list (bare, or under "runners" / "data.runners"). Unset: names come
+# from event_list only. Neither source is verified against the live exchange.
+RUNNERS_API = os.environ.get('RUNNERS_API', "")
 EVENTS_HEADERS = {
     "accept": "application/json",
     "origin": "https://d99exch.com",
@@ -30,8 +42,33 @@ ODDS_HEADERS = {
 }
 
 # Tracking - 100ms for ultra-precise tracking
+# Defaults only: env vars and the hot-reloaded config file / watchlist override them
 POLL_INTERVAL = 0.1
 SPORTS_TO_TRACK = [4, 1, 2, 7]  # Cricket, Soccer, Tennis, Horse Racing
+CONFIG_PATH = Path(os.environ.get('TRACKER_CONFIG', DB_PATH.parent / 'tracker_config.json'))
+WATCHLIST_PATH = Path(os.environ.get('WATCHLIST', DB_PATH.parent / 'watchlist.txt'))
+STATS_INTERVAL = 5  # seconds between status lines
+
+# Binary ladder snapshots shared with the dashboard (and optionally archived)
+LADDER_RING_PATH = DB_PATH.parent / 'ladders.ring'
+ARCHIVE_LADDERS = False
+ARCHIVE_DIR = DB_PATH.parent / 'archive'
+ladder_ring = None
+
+# Rollups - window used to rank markets by recent inflow
+RECENT_WINDOW = 300  # seconds
+MARKET_ROLLUP_RETENTION = 86400  # seconds a finished market's rollup row is kept
+
+# market_id -> {'entries': deque[(ts, amount)], 'total': float}
+recent_inflow = {}
+
+# market_id -> {'by_id': {selection_id: name}, 'by_position': [names]}
+runner_names = {}
+RUNNER_LOOKUP_RETRY = 30  # seconds before retrying a market whose runners could not be named
+runner_lookups = {}  # market_id -> time of the last unsuccessful RUNNERS_API lookup
+
+# Counters reported on the status line
+stats = {'rows_written': 0}
 
 def init_database():
     """Initialize SQLite database"""
@@ -50,6 +87,8 @@ def init_database():
             if 'selection_id' not in columns:
                 print("⚠️ Old schema detected, recreating table...")
                 cursor.execute("DROP TABLE cumulative")
+                cursor.execute("DROP TABLE IF EXISTS rollups")
+                cursor.execute("DROP TABLE IF EXISTS market_rollups")
                 table_exists = None
         
         if not table_exists:
@@ -75,6 +114,42 @@ def init_database():
         else:
             print(f"✅ Database table exists: {DB_PATH}")
         
+        # Aggregate flow per sport / competition, maintained incrementally
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollups (
+                scope TEXT NOT NULL,
+                scope_key TEXT NOT NULL,
+                sport_id INTEGER,
+                total_in REAL DEFAULT 0,
+                total_out REAL DEFAULT 0,
+                net REAL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (scope, sport_id, scope_key)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rollups_net ON rollups(scope, sport_id, net DESC)")
+        
+        # Per-market totals for live markets, ranked by recent inflow
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS market_rollups (
+                market_id TEXT PRIMARY KEY,
+                event_name TEXT NOT NULL,
+                sport_id INTEGER,
+                competition_name TEXT,
+                total_in REAL DEFAULT 0,
+                total_out REAL DEFAULT 0,
+                net REAL DEFAULT 0,
+                recent_in REAL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_market_rollups_recent ON market_rollups(recent_in DESC)")
+        # Recent-inflow windows live in memory and do not survive a restart
+        cursor.execute("UPDATE market_rollups SET recent_in = 0")
+        # The leaderboard hides idle rows itself; only clear out long-finished markets
+        retention_cutoff = datetime.fromtimestamp(time.time() - MARKET_ROLLUP_RETENTION, timezone.utc).isoformat()
+        cursor.execute("DELETE FROM market_rollups WHERE updated_at < ?", (retention_cutoff,))
+        
         conn.commit()
         conn.close()
         return True
@@ -82,23 +157,103 @@ def init_database():
         print(f"❌ Database error: {e}")
         return False
 
-def fetch_live_events():
-    """Fetch live events from all tracked sports"""
+def fetch_live_events(sport_ids=None, watchlist=()):
+    """Fetch live (or watchlisted) events from all tracked sports"""
     all_events = []
-    for sport_id in SPORTS_TO_TRACK:
+    for sport_id in (SPORTS_TO_TRACK if sport_ids is None else sport_ids):
         try:
             url = f"{EVENTS_API}?sport_id={sport_id}"
             resp = requests.get(url, headers=EVENTS_HEADERS, timeout=5)
             if resp.status_code == 200:
                 data = resp.json()
                 events = data.get("data", {}).get("events", [])
-                live_events = [e for e in events if e.get("in_play") == 1]
+                live_events = [e for e in events
+                               if e.get("in_play") == 1 or str(e.get("market_id")) in watchlist]
                 all_events.extend(live_events)
         except:
             pass
     return all_events
 
-def parse_market_data(odds_str, event_name=""):
+def parse_ladder_levels(parts, start):
+    """Parse 3 (price, size) levels starting at parts[start]"""
+    levels = []
+    for j in range(start, start + 6, 2):
+        if j + 1 < len(parts):
+            try:
+                price = float(parts[j])
+                size = float(parts[j+1]) if parts[j+1] else 0.0
+                levels.append({'price': price, 'size': size})
+            except:
+                pass
+    return levels
+
+def split_team_names(event_name):
+    """Team names from a "Team A v Team B" event name"""
+    if ' v ' in event_name:
+        return [t.strip() for t in event_name.split(' v ', 1)]
+    elif ' VS ' in event_name or ' vs ' in event_name:
+        sep = ' VS ' if ' VS ' in event_name else ' vs '
+        return [t.strip() for t in event_name.split(sep, 1)]
+    return []
+
+def runners_by_id(runners):
+    """{selection_id: name} from a runner list (selection_id/selectionId, runner_name/runnerName/name)"""
+    by_id = {}
+    for runner in runners:
+        if not isinstance(runner, dict):
+            continue
+        selection_id = runner.get('selection_id', runner.get('selectionId'))
+        name = runner.get('runner_name') or runner.get('runnerName') or runner.get('name')
+        if selection_id is not None and name:
+            by_id[str(selection_id)] = str(name).strip()
+    return by_id
+
+def fetch_market_runners(market_id):
+    """Runner list for a market from RUNNERS_API, [] when unset or unavailable"""
+    if not RUNNERS_API:
+        return []
+    try:
+        resp = requests.get(RUNNERS_API, params={'market_id': market_id}, headers=EVENTS_HEADERS, timeout=3)
+        if resp.status_code == 200:
+            data = resp.json()
+            if isinstance(data, dict):
+                data = data.get('data', data)
+            if isinstance(data, dict):
+                data = data.get('runners', [])
+            return data if isinstance(data, list) else []
+    except Exception as e:
+        print(f"Fetch runners error: {e}")
+    return []
+
+def resolve_runner_names(market_id, event):
+    """Resolve selection ids to runner names, cached once they are known
+    
+    Uses the event's runner list when the feed sends one, then RUNNERS_API
+    for markets whose event name is not "Team A v Team B" (racing). A market
+    left without names is not cached; RUNNERS_API is retried every
+    RUNNER_LOOKUP_RETRY seconds.
+    """
+    meta = runner_names.get(market_id)
+    if meta is not None:
+        return meta
+    
+    event_name = event.get("name", event.get("event_name", ""))
+    by_position = split_team_names(event_name)
+    by_id = runners_by_id(event.get('runners') or [])
+    if not by_id and not by_position:
+        now = time.time()
+        if RUNNERS_API and now - runner_lookups.get(market_id, 0) >= RUNNER_LOOKUP_RETRY:
+            by_id = runners_by_id(fetch_market_runners(market_id))
+            if not by_id:
+                runner_lookups[market_id] = now
+    
+    meta = {'by_id': by_id, 'by_position': by_position}
+    if by_id or by_position:
+        runner_names[market_id] = meta
+        runner_lookups.pop(market_id, None)
+    return meta
+
+def parse_market_data(odds_str, event_name="", runner_meta=None):
     """Parse pipe-delimited market data from POST API response
     
     Format example:
@@ -114,26 +269,16 @@ def parse_market_data(odds_str, event_name=""):
         market_id = parts[0]
         selections = []
         
-        # Extract team names from event_name if available
-        team_names = []
-        if event_name:
-            if ' v ' in event_name:
-                team_names = [t.strip() for t in event_name.split(' v ', 1)]
-            elif ' VS ' in event_name or ' vs ' in event_name:
-                sep = ' VS ' if ' VS ' in event_name else ' vs '
-                team_names = [t.strip() for t in event_name.split(sep, 1)]
+        if runner_meta is None:
+            runner_meta = {'by_id': {}, 'by_position': split_team_names(event_name)}
         
         # Find ACTIVE sections (each runner starts with selection_id followed by ACTIVE)
-        runner_idx = 0
         i = 0
         while i < len(parts):
             if parts[i] == 'ACTIVE':
                 # Found a runner section
                 # Format: selection_id|ACTIVE|back1_price|back1_stake|back2_price|back2_stake|back3_price|back3_stake|lay1_price|lay1_stake|...
-                selection_id = parts[i-1] if i > 0 else str(runner_idx)
-                
-                # Get team name
-                team_name = team_names[runner_idx] if runner_idx < len(team_names) else f"Selection {runner_idx + 1}"
+                selection_id = parts[i-1] if i > 0 else str(len(selections))
                 
                 # Parse back stakes (positions i+2, i+4, i+6 are stakes)
                 back_stakes = []
@@ -155,13 +300,29 @@ def parse_market_data(odds_str, event_name=""):
                 
                 selections.append({
                     'selection_id': selection_id,
-                    'team': team_name,
                     'back_stake': sum(back_stakes),
-                    'lay_stake': sum(lay_stakes)
+                    'lay_stake': sum(lay_stakes),
+                    'back': parse_ladder_levels(parts, i + 1),
+                    'lay': parse_ladder_levels(parts, i + 7)
                 })
                 
-                runner_idx += 1
-            i += 1
+                # Skip the 12 ladder values; the next selection_id follows them
+                i += 13
+            else:
+                i += 1
+        
+        # Name runners: event runner list, then team names by position
+        by_id = runner_meta['by_id']
+        by_position = runner_meta['by_position']
+        for runner_idx, selection in enumerate(selections):
+            if selection['selection_id'] in by_id:
+                selection['team'] = by_id[selection['selection_id']]
+            elif runner_idx < len(by_position):
+                selection['team'] = by_position[runner_idx]
+            elif runner_idx == 2 and len(selections) == 3 and len(by_position) == 2:
+                selection['team'] = "Draw"
+            else:
+                selection['team'] = f"Selection {runner_idx + 1}"
         
         if selections:
             return {'market_id': market_id, 'selections': selections}
@@ -169,154 +330,311 @@ def parse_market_data(odds_str, event_name=""):
         print(f"Parse error: {e}")
     return None
 
-def fetch_market_odds(market_id, sport_id=4, event_name=""):
+def fetch_market_odds(market_id, sport_id=4, event_name="", runner_meta=None):
     """Fetch odds for a market using POST request"""
     try:
         resp = requests.post(ODDS_API, data=f"market_ids[]={market_id}", headers=ODDS_HEADERS, timeout=3)
         if resp.status_code == 200:
             result = resp.json()
             if result and result[0]:
-                return parse_market_data(result[0], event_name)
+                return parse_market_data(result[0], event_name, runner_meta)
     except Exception as e:
         print(f"Fetch odds error: {e}")
     return None
 
-def get_last_cumulative(market_id, selection_id):
-    """Get last cumulative record"""
+def update_market_cumulative(market_id, selections, timestamp, rollup=None):
+    """Update cumulative tracking for every runner of a market in one transaction
+    
+    rollup ({'event_name', 'sport_id', 'competition'}) applies the tick's flow
+    to the rollup tables in the same transaction, so they can never drift
+    from cumulative. Returns (flow_in, flow_out, live_in); live_in leaves out
+    runners seen for the first time, whose opening stakes are not money movement.
+    """
+    market_in = market_out = live_in = 0.0
+    conn = None
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.execute("""
-            SELECT in_back, in_lay, out_back, out_lay, last_back_stake, last_lay_stake
+            SELECT selection_id, in_back, in_lay, out_back, out_lay, last_back_stake, last_lay_stake
             FROM cumulative
-            WHERE market_id = ? AND selection_id = ?
-        """, (market_id, selection_id))
-        row = cursor.fetchone()
-        conn.close()
+            WHERE market_id = ?
+        """, (market_id,))
+        last_rows = {row[0]: {
+            'in_back': row[1], 'in_lay': row[2],
+            'out_back': row[3], 'out_lay': row[4],
+            'last_back_stake': row[5], 'last_lay_stake': row[6]
+        } for row in cursor.fetchall()}
         
-        if row:
-            return {
-                'in_back': row[0], 'in_lay': row[1],
-                'out_back': row[2], 'out_lay': row[3],
-                'last_back_stake': row[4], 'last_lay_stake': row[5]
-            }
-    except:
-        pass
-    return None
-
-def update_cumulative(market_id, selection_id, team_label, current_back, current_lay, timestamp):
-    """Update cumulative tracking"""
-    try:
-        last = get_last_cumulative(market_id, selection_id)
-        
-        if last:
-            delta_back = current_back - last['last_back_stake']
-            delta_lay = current_lay - last['last_lay_stake']
+        rows = []
+        for selection in selections:
+            team_label = selection['team']
+            current_back = selection['back_stake']
+            current_lay = selection['lay_stake']
+            last = last_rows.get(selection['selection_id'])
             
-            in_back = last['in_back']
-            in_lay = last['in_lay']
-            out_back = last['out_back']
-            out_lay = last['out_lay']
-            
-            if delta_back > 0:
-                in_back += delta_back
-            elif delta_back < 0:
-                out_back += abs(delta_back)
-            
-            if delta_lay > 0:
-                in_lay += delta_lay
-            elif delta_lay < 0:
-                out_lay += abs(delta_lay)
+            if last:
+                delta_back = current_back - last['last_back_stake']
+                delta_lay = current_lay - last['last_lay_stake']
+                
+                in_back = last['in_back']
+                in_lay = last['in_lay']
+                out_back = last['out_back']
+                out_lay = last['out_lay']
+                
+                if delta_back > 0:
+                    in_back += delta_back
+                elif delta_back < 0:
+                    out_back += abs(delta_back)
+                
+                if delta_lay > 0:
+                    in_lay += delta_lay
+                elif delta_lay < 0:
+                    out_lay += abs(delta_lay)
+                
+                if abs(delta_back) > 100 or abs(delta_lay) > 100:
+                    print(f"💰 {team_label}: ΔBack={delta_back:+.2f}, ΔLay={delta_lay:+.2f}")
+                
+                flow_in = (in_back - last['in_back']) + (in_lay - last['in_lay'])
+                market_in += flow_in
+                market_out += (out_back - last['out_back']) + (out_lay - last['out_lay'])
+                live_in += flow_in
+            else:
+                in_back = current_back
+                in_lay = current_lay
+                out_back = 0.0
+                out_lay = 0.0
+                market_in += in_back + in_lay
+                print(f"🆕 {team_label}: Back={current_back:.2f}, Lay={current_lay:.2f}")
             
-            if abs(delta_back) > 100 or abs(delta_lay) > 100:
-                print(f"💰 {team_label}: ΔBack={delta_back:+.2f}, ΔLay={delta_lay:+.2f}")
-        else:
-            in_back = current_back
-            in_lay = current_lay
-            out_back = 0.0
-            out_lay = 0.0
-            print(f"🆕 {team_label}: Back={current_back:.2f}, Lay={current_lay:.2f}")
-        
-        net_back = in_back - out_back
-        net_lay = in_lay - out_lay
+            rows.append((market_id, selection['selection_id'], team_label, in_back, in_lay, out_back, out_lay,
+                         in_back - out_back, in_lay - out_lay, current_back, current_lay, timestamp))
         
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("""
+        conn.executemany("""
             INSERT OR REPLACE INTO cumulative 
             (market_id, selection_id, team_label, in_back, in_lay, out_back, out_lay, 
              net_back, net_lay, last_back_stake, last_lay_stake, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (market_id, selection_id, team_label, in_back, in_lay, out_back, out_lay, 
-              net_back, net_lay, current_back, current_lay, timestamp))
+        """, rows)
+        
+        now = time.time()
+        if rollup:
+            # Only add this tick to the in-memory window once the commit succeeds
+            recent_in = record_recent_inflow(market_id, 0.0, now) + live_in
+            apply_rollups(conn, market_id, rollup, market_in, market_out, recent_in, timestamp)
         conn.commit()
-        conn.close()
+        if rollup:
+            record_recent_inflow(market_id, live_in, now)
+        stats['rows_written'] += len(rows)
     except Exception as e:
         print(f"❌ Update error: {e}")
+        return 0.0, 0.0, 0.0
+    finally:
+        if conn:
+            conn.close()
+    return market_in, market_out, live_in
 
-def track_market(market_id, sport_id=4, event_name=""):
-    """Track a market"""
-    market_data = fetch_market_odds(market_id, sport_id, event_name)
+def prune_recent_inflow(live_market_ids, now):
+    """Forget windows of markets that are no longer tracked and have gone quiet
+    
+    Windows survive short gaps in the event feed so a market that reappears
+    keeps its recent inflow.
+    """
+    cutoff = now - RECENT_WINDOW
+    for market_id in list(recent_inflow):
+        entries = recent_inflow[market_id]['entries']
+        if market_id not in live_market_ids and (not entries or entries[-1][0] < cutoff):
+            del recent_inflow[market_id]
+
+def record_recent_inflow(market_id, amount, now):
+    """Add inflow to the market's sliding window and return the window total"""
+    window = recent_inflow.setdefault(market_id, {'entries': deque(), 'total': 0.0})
+    if amount > 0:
+        window['entries'].append((now, amount))
+        window['total'] += amount
+    
+    cutoff = now - RECENT_WINDOW
+    while window['entries'] and window['entries'][0][0] < cutoff:
+        window['total'] -= window['entries'].popleft()[1]
+    if not window['entries']:
+        window['total'] = 0.0
+    return window['total']
+
+def apply_rollups(conn, market_id, rollup, flow_in, flow_out, recent_in, timestamp):
+    """Apply one tick's flow to the sport, competition and market rollups
+    
+    Runs on the caller's connection and transaction; the caller commits.
+    """
+    event_name = rollup['event_name']
+    sport_id = rollup['sport_id']
+    competition = rollup['competition']
+    net = flow_in - flow_out
+    if flow_in or flow_out:
+        for scope, scope_key in (('sport', str(sport_id)), ('competition', competition)):
+            conn.execute("""
+                INSERT INTO rollups (scope, scope_key, sport_id, total_in, total_out, net, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope, sport_id, scope_key) DO UPDATE SET
+                    total_in = total_in + excluded.total_in,
+                    total_out = total_out + excluded.total_out,
+                    net = net + excluded.net,
+                    updated_at = excluded.updated_at
+            """, (scope, scope_key, sport_id, flow_in, flow_out, net, timestamp))
+    # Market totals come from the market's own cumulative rows, so a row that
+    # was pruned or missed ticks is rebuilt correctly instead of from one delta
+    conn.execute("""
+        INSERT INTO market_rollups
+        (market_id, event_name, sport_id, competition_name, total_in, total_out, net, recent_in, updated_at)
+        SELECT ?, ?, ?, ?,
+               SUM(in_back + in_lay), SUM(out_back + out_lay),
+               SUM(net_back + net_lay), ?, ?
+        FROM cumulative
+        WHERE market_id = ?
+        ON CONFLICT(market_id) DO UPDATE SET
+            total_in = excluded.total_in,
+            total_out = excluded.total_out,
+            net = excluded.net,
+            recent_in = excluded.recent_in,
+            updated_at = excluded.updated_at
+    """, (market_id, event_name, sport_id, competition, recent_in, timestamp, market_id))
+
+def publish_ladder(market_data):
+    """Publish a parsed ladder to the shared ring buffer and archive"""
+    try:
+        now = time.time()
+        if ladder_ring:
+            ladder_ring.publish(market_data['market_id'], market_data['selections'], now)
+        if ARCHIVE_LADDERS:
+            day = datetime.now(timezone.utc).strftime('%Y%m%d')
+            append_archive(ARCHIVE_DIR / f"ladders-{day}.bin", market_data['market_id'], market_data['selections'], now)
+    except Exception as e:
+        print(f"❌ Ladder publish error: {e}")
+
+def track_market(market_id, sport_id=4, event_name="", competition="Other", runner_meta=None):
+    """Track a market (sport_id None: not known yet, skip the rollups)"""
+    market_data = fetch_market_odds(market_id, sport_id, event_name, runner_meta)
     if not market_data:
         return False
     
-    timestamp = datetime.now(timezone.utc).isoformat()
+    publish_ladder(market_data)
     
-    for selection in market_data['selections']:
-        update_cumulative(
-            market_id, 
-            selection['selection_id'], 
-            selection['team'],
-            selection['back_stake'], 
-            selection['lay_stake'], 
-            timestamp
-        )
+    timestamp = datetime.now(timezone.utc).isoformat()
+    rollup = None
+    if sport_id is not None:
+        rollup = {'event_name': event_name, 'sport_id': sport_id, 'competition': competition}
+    update_market_cumulative(market_id, market_data['selections'], timestamp, rollup)
     
     return True
 
 def main():
     """Main loop"""
+    global ladder_ring
     print("=" * 60)
-    print("🚀 ULTRA-PRECISE TRACKER (100ms polling)")
+    print("🚀 ULTRA-PRECISE TRACKER")
     print(f"📂 Database: {DB_PATH}")
+    print(f"⚙️  Config: {CONFIG_PATH} | Watchlist: {WATCHLIST_PATH}")
     print("=" * 60)
     
     if not init_database():
         return
     
+    try:
+        ladder_ring = LadderRing(LADDER_RING_PATH, writer=True)
+        print(f"✅ Ladder ring: {LADDER_RING_PATH}")
+    except Exception as e:
+        print(f"⚠️ Ladder ring unavailable: {e}")
+    if ARCHIVE_LADDERS:
+        ARCHIVE_DIR.mkdir(exist_ok=True)
+    
+    config = TrackerConfig(CONFIG_PATH, WATCHLIST_PATH, POLL_INTERVAL, SPORTS_TO_TRACK)
     tracked_markets = {}
+    market_meta = {}  # market_id -> last feed entry, for watchlisted markets the feed drops
+    last_polled = {}
     poll_count = 0
+    cycle_times = []
+    last_stats = time.time()
     
     while True:
         try:
             loop_start = time.time()
-            events = fetch_live_events()
-            current_markets = {}
+            config.reload_if_changed()
+            # Watchlisted markets ignore sport exclusions, so their sports still need fetching
+            sport_ids = config.settings['sports'] if config.watchlist else config.sports
+            events = fetch_live_events(sport_ids, config.watchlist)
             
+            candidates = {}
             for event in events:
                 market_id = event.get("market_id")
-                event_name = event.get("name", event.get("event_name", "Unknown"))
-                sport_id = event.get("event_type_id", event.get("sport_id", 4))  # API uses event_type_id
+                if market_id and market_id not in candidates:
+                    candidates[market_id] = {
+                        'market_id': market_id,
+                        'event_name': event.get("name", event.get("event_name", "Unknown")),
+                        'sport_id': event.get("event_type_id", event.get("sport_id", 4)),  # API uses event_type_id
+                        'competition': event.get("competition_name") or "Other",
+                        'event': event
+                    }
+            
+            # Watchlisted markets stay tracked 24/7, even once the feed stops listing them
+            # Reuse the last known entry; if there is none the sport, competition
+            # and runners stay unknown (no rollups, no cached runner names)
+            for market_id in config.watchlist - set(candidates):
+                candidates[market_id] = market_meta.get(market_id) or {
+                    'market_id': market_id,
+                    'event_name': tracked_markets.get(market_id, f"Watchlist {market_id}"),
+                    'sport_id': None,
+                    'competition': None,
+                    'event': None
+                }
+            
+            current_markets = {}
+            for market in config.select_markets(list(candidates.values())):
+                market_id = market['market_id']
+                event_name = market['event_name']
+                sport_id = market['sport_id']
+                current_markets[market_id] = event_name
+                if market['event'] is not None:
+                    market_meta[market_id] = market
+                
+                if market_id not in tracked_markets:
+                    sport_name = {1: "⚽", 2: "🎾", 4: "🏏", 7: "🏇"}.get(sport_id, "🎯")
+                    print(f"🆕 {sport_name} {event_name} ({market_id})")
+                    tracked_markets[market_id] = event_name
                 
-                if market_id:
-                    current_markets[market_id] = event_name
-                    
-                    if market_id not in tracked_markets:
-                        sport_name = {1: "⚽", 2: "🎾", 4: "🏏", 7: "🏇"}.get(sport_id, "🎯")
-                        print(f"🆕 {sport_name} {event_name} ({market_id})")
-                        tracked_markets[market_id] = event_name
-                    
-                    track_market(market_id, sport_id, event_name)
+                # Each market polls at its own profile's rate; the loop runs at the fastest
+                if loop_start - last_polled.get(market_id, 0) < config.interval_for(market_id, sport_id):
+                    continue
+                last_polled[market_id] = loop_start
+                
+                runner_meta = None
+                if market['event'] is not None:
+                    runner_meta = resolve_runner_names(market_id, market['event'])
+                track_market(market_id, sport_id, event_name, market['competition'], runner_meta)
             
             finished = set(tracked_markets.keys()) - set(current_markets.keys())
             for market_id in finished:
                 print(f"🏁 {tracked_markets[market_id]}")
                 del tracked_markets[market_id]
+                last_polled.pop(market_id, None)
+                market_meta.pop(market_id, None)
+                runner_names.pop(market_id, None)
+                runner_lookups.pop(market_id, None)
             
             poll_count += 1
-            if poll_count % 50 == 0:
-                print(f"✅ Poll #{poll_count} | {len(tracked_markets)} matches")
-            
             elapsed = time.time() - loop_start
-            time.sleep(max(0, POLL_INTERVAL - elapsed))
+            cycle_times.append(elapsed)
+            
+            now = time.time()
+            if now - last_stats >= STATS_INTERVAL:
+                avg_ms = sum(cycle_times) / len(cycle_times) * 1000
+                max_ms = max(cycle_times) * 1000
+                rows_per_s = stats['rows_written'] / (now - last_stats)
+                print(f"✅ Poll #{poll_count} | {len(tracked_markets)} matches | "
+                      f"cycle {avg_ms:.0f}ms avg / {max_ms:.0f}ms max | {rows_per_s:.0f} rows/s")
+                cycle_times = []
+                stats['rows_written'] = 0
+                last_stats = now
+                prune_recent_inflow(tracked_markets, now)
+            
+            time.sleep(max(0, config.fastest_interval - elapsed))
             
         except KeyboardInterrupt:
             print("\n⏹️  Stopped")
@@ -4,16 +4,36 @@ Advanced Market Load Tracker - Real-time Odds Dashboard
 import streamlit as st
 import requests
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import os
 
+from ladder_format import LadderRing
+from tracker_config import TrackerConfig
+
 # Database path (same as background tracker)
-if os.path.exists('/data'):
+if os.environ.get('TRACKER_DB'):
+    DB_PATH = Path(os.environ['TRACKER_DB'])
+elif os.path.exists('/data'):
     DB_PATH = Path('/data') / 'tracker.db'
 else:
     DB_PATH = Path(__file__).parent / 'data' / 'tracker.db'
 
+# API endpoints (overridable, e.g. to point at the load-test fake exchange)
+EVENTS_API = os.environ.get('EVENTS_API', "https://api.d99exch.com/api/guest/event_list")
+ODDS_API = os.environ.get('ODDS_API', "https://odds.o99exch.com/ws/getMarketDataNew")
+
+# Binary ladder ring written by the background tracker
+LADDER_RING_PATH = DB_PATH.parent / 'ladders.ring'
+RING_AGE_SLACK = 2.0  # seconds past a market's polling interval before falling back to the odds API
+
+# Tracker config (same files as the background tracker), for per-market polling intervals
+CONFIG_PATH = Path(os.environ.get('TRACKER_CONFIG', DB_PATH.parent / 'tracker_config.json'))
+WATCHLIST_PATH = Path(os.environ.get('WATCHLIST', DB_PATH.parent / 'watchlist.txt'))
+
+# Markets with more runners than this (racing) get the ranked table layout
+MULTI_RUNNER_THRESHOLD = 3
+
 st.set_page_config(
     page_title="Market Load Tracker",
     page_icon="📊",
@@ -108,12 +128,78 @@ def get_cumulative_data(market_id):
         print(f"❌ Database error: {e}")
         return []
 
+def get_leaderboard(sport_id, limit=5, live_window=60):
+    """Fetch pre-aggregated flow rollups maintained by the background tracker
+    
+    Every query is an indexed top-N read, so the cost does not grow with the
+    number of live markets.
+    """
+    leaderboard = {'sports': [], 'competitions': [], 'markets': []}
+    try:
+        if not DB_PATH.exists():
+            return leaderboard
+        
+        conn = sqlite3.connect(DB_PATH)
+        leaderboard['sports'] = [{
+            'sport_id': row[0], 'total_in': row[1], 'total_out': row[2], 'net': row[3]
+        } for row in conn.execute("""
+            SELECT sport_id, total_in, total_out, net
+            FROM rollups
+            WHERE scope = 'sport'
+            ORDER BY net DESC
+        """)]
+        leaderboard['competitions'] = [{
+            'name': row[0], 'total_in': row[1], 'total_out': row[2], 'net': row[3]
+        } for row in conn.execute("""
+            SELECT scope_key, total_in, total_out, net
+            FROM rollups
+            WHERE scope = 'competition' AND sport_id = ?
+            ORDER BY net DESC
+            LIMIT ?
+        """, (sport_id, limit))]
+        
+        # Skip rows left behind by a tracker that stopped mid-match
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=live_window)).isoformat()
+        leaderboard['markets'] = [{
+            'market_id': row[0], 'event_name': row[1], 'sport_id': row[2],
+            'recent_in': row[3], 'net': row[4]
+        } for row in conn.execute("""
+            SELECT market_id, event_name, sport_id, recent_in, net
+            FROM market_rollups
+            WHERE updated_at >= ?
+            ORDER BY recent_in DESC
+            LIMIT ?
+        """, (cutoff, limit))]
+        conn.close()
+    except Exception as e:
+        print(f"❌ Leaderboard error: {e}")
+    return leaderboard
+
+@st.cache_data(ttl=30)  # Picks up names the tracker resolves later; entries expire with the market
+def get_runner_labels(market_id):
+    """Runner names resolved by the background tracker ({selection_id: name})"""
+    try:
+        if not DB_PATH.exists():
+            return {}
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.execute("""
+            SELECT selection_id, team_label
+            FROM cumulative
+            WHERE market_id = ?
+        """, (str(market_id),))
+        labels = {row[0]: row[1] for row in cursor.fetchall()}
+        conn.close()
+        return labels
+    except Exception as e:
+        print(f"❌ Database error: {e}")
+        return {}
+
 @st.cache_data(ttl=1.5)  # Refresh every 1.5 seconds
 def fetch_events_by_sport(sport_id):
     """Fetch live events for a specific sport"""
     try:
         headers = {"accept": "application/json", "origin": "https://d99exch.com", "referer": "https://d99exch.com/"}
-        url = f"https://api.d99exch.com/api/guest/event_list?sport_id={sport_id}"
+        url = f"{EVENTS_API}?sport_id={sport_id}"
         resp = requests.get(url, headers=headers, timeout=10)
         if resp.status_code == 200:
             data = resp.json()
@@ -134,31 +220,99 @@ def fetch_events_by_sport(sport_id):
         print(f"❌ Error fetching events: {e}")
         return []
 
-def fetch_odds(market_id, event_name=""):
+@st.cache_resource
+def get_ladder_ring():
+    """Open the tracker's shared ladder ring buffer (read-only)
+
+    Raises when the ring is missing or unreadable, so the failure is not
+    cached and the next call retries (e.g. once the tracker has started).
+    """
+    return LadderRing(LADDER_RING_PATH)
+
+def open_ladder_ring():
+    """Cached ladder ring, reopened when the tracker replaced it, or None"""
+    try:
+        ring = get_ladder_ring()
+        if ring.is_stale():
+            get_ladder_ring.clear()
+            ring = get_ladder_ring()
+        return ring
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ladder ring unavailable: {e}")
+        return None
+
+@st.cache_resource
+def get_tracker_config():
+    """The tracker's polling config, shared across sessions"""
+    return TrackerConfig(CONFIG_PATH, WATCHLIST_PATH)
+
+def ring_max_age(market_id, sport_id):
+    """How old a ring snapshot may be: the market's polling interval plus slack"""
+    try:
+        config = get_tracker_config()
+        config.reload_if_changed()
+        return config.interval_for(str(market_id), sport_id) + RING_AGE_SLACK
+    except Exception as e:
+        print(f"⚠️ Tracker config unavailable: {e}")
+        return RING_AGE_SLACK
+
+def read_ring_odds(market_id, event_name="", sport_id=None):
+    """Latest ladder from the background tracker, without an API call"""
+    ring = open_ladder_ring()
+    if not ring:
+        return None
+    try:
+        snapshot = ring.latest(market_id, max_age=ring_max_age(market_id, sport_id))
+    except Exception as e:
+        print(f"⚠️ Ladder ring read error: {e}")
+        return None
+    if snapshot and snapshot['runners']:
+        return {"runners": name_runners(snapshot['runners'], event_name, get_runner_labels(market_id))}
+    return None
+
+def fetch_odds(market_id, event_name="", sport_id=None):
+    ring_odds = read_ring_odds(market_id, event_name, sport_id)
+    if ring_odds:
+        return ring_odds
     try:
-        url = "https://odds.o99exch.com/ws/getMarketDataNew"
         headers = {"content-type": "application/x-www-form-urlencoded", "origin": "https://99exch.com"}
-        resp = requests.post(url, data=f"market_ids[]={market_id}", headers=headers, timeout=5)
+        resp = requests.post(ODDS_API, data=f"market_ids[]={market_id}", headers=headers, timeout=5)
         if resp.status_code == 200:
             result = resp.json()
             if result and result[0]:
-                return parse_odds(result[0], event_name)
+                return parse_odds(result[0], event_name, get_runner_labels(market_id))
     except:
         pass
     return None
 
-def parse_odds(odds_str, event_name=""):
+def name_runners(runners, event_name="", labels=None):
+    """Attach display names from tracker labels, else the event name ("Team A v Team B")"""
+    team_names = []
+    if ' v ' in event_name:
+        team_names = [t.strip() for t in event_name.split(' v ', 1)]
+    elif ' VS ' in event_name or ' vs ' in event_name:
+        sep = ' VS ' if ' VS ' in event_name else ' vs '
+        team_names = [t.strip() for t in event_name.split(sep, 1)]
+    
+    for runner_idx, runner in enumerate(runners):
+        runner['name'] = team_names[runner_idx] if runner_idx < len(team_names) else f"Selection {runner_idx + 1}"
+    if len(runners) == 3 and len(team_names) == 2:
+        runners[2]['name'] = "Draw"
+    
+    if labels:
+        for runner in runners:
+            label = labels.get(runner.get('selection_id'))
+            if label:
+                runner['name'] = label
+    return runners
+
+def parse_odds(odds_str, event_name="", labels=None):
     try:
         parts = odds_str.split('|')
         runners = []
-        team_names = []
-        if ' v ' in event_name:
-            team_names = [t.strip() for t in event_name.split(' v ', 1)]
-        elif ' VS ' in event_name or ' vs ' in event_name:
-            sep = ' VS ' if ' VS ' in event_name else ' vs '
-            team_names = [t.strip() for t in event_name.split(sep, 1)]
         
-        runner_idx = 0
         i = 0
         while i < len(parts):
             if parts[i] == 'ACTIVE':
@@ -178,15 +332,12 @@ def parse_odds(odds_str, event_name=""):
                         except:
                             pass
                         j += 2
-                name = team_names[runner_idx] if runner_idx < len(team_names) else f"Selection {runner_idx + 1}"
-                runners.append({"name": name, "back": back_prices, "lay": lay_prices})
-                runner_idx += 1
+                selection_id = parts[i-1] if i > 0 else str(len(runners))
+                runners.append({"selection_id": selection_id, "back": back_prices, "lay": lay_prices})
                 i = j
             else:
                 i += 1
-        if len(runners) == 3 and len(team_names) == 2:
-            runners[2]['name'] = "Draw"
-        return {"runners": runners} if runners else None
+        return {"runners": name_runners(runners, event_name, labels)} if runners else None
     except:
         return None
 
@@ -235,12 +386,43 @@ def calculate_market_load(runners):
     
     return market_load
 
+def ranked_runner_rows(runners, market_load):
+    """Table rows for multi-runner markets, favourite (shortest back price) first"""
+    rows = []
+    for runner, load in zip(runners, market_load):
+        back = runner.get('back') or [{}]
+        lay = runner.get('lay') or [{}]
+        rows.append({
+            'Runner': runner.get('name', 'Unknown'),
+            'Back': back[0].get('price'),
+            'Back ₹': format_stake(back[0].get('size', 0)),
+            'Lay': lay[0].get('price'),
+            'Lay ₹': format_stake(lay[0].get('size', 0)),
+            'Total Bet': format_stake(load['total_bet']),
+            'Load %': round(load['percentage'], 1),
+        })
+    rows.sort(key=lambda r: r['Back'] if r['Back'] else float('inf'))
+    return [{'#': rank, **row} for rank, row in enumerate(rows, 1)]
+
+def ranked_cumulative_rows(cumulative_data):
+    """Table rows for multi-runner cumulative flow, biggest net back first"""
+    rows = sorted(cumulative_data, key=lambda c: c['net_back'], reverse=True)
+    return [{
+        '#': rank,
+        'Runner': cum['team'],
+        'In (Back)': format_stake(cum['in_back']),
+        'In (Lay)': format_stake(cum['in_lay']),
+        'Out (Back)': format_stake(cum['out_back']),
+        'Out (Lay)': format_stake(cum['out_lay']),
+        'Net Back': format_stake(cum['net_back']),
+        'Net Lay': format_stake(cum['net_lay']),
+    } for rank, cum in enumerate(rows, 1)]
+
 def quick_check_odds_available(market_id):
     """Quick check if odds are available without full parsing"""
     try:
-        url = "https://odds.o99exch.com/ws/getMarketDataNew"
         headers = {"content-type": "application/x-www-form-urlencoded", "origin": "https://99exch.com"}
-        resp = requests.post(url, data=f"market_ids[]={market_id}", headers=headers, timeout=3)
+        resp = requests.post(ODDS_API, data=f"market_ids[]={market_id}", headers=headers, timeout=3)
         if resp.status_code == 200:
             result = resp.json()
             # Just check if we got data, don't parse it
@@ -260,7 +442,7 @@ def sort_events_by_odds_availability(events):
         
         if market_id:
             # Fetch odds to check availability (will be cached)
-            odds_data = fetch_odds(market_id, event.get('name', ''))
+            odds_data = fetch_odds(market_id, event.get('name', ''), event.get('event_type_id', event.get('sport_id')))
             if odds_data and odds_data.get('runners'):
                 has_odds = True
         
@@ -304,6 +486,31 @@ with col2:
         st.cache_data.clear()
         st.rerun()
     st.markdown('<div style="background: rgba(16, 185, 129, 0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #10b981;">🔴 LIVE</span></div>', unsafe_allow_html=True)
+    
+    # Money-flow leaderboard (pre-aggregated by the background tracker)
+    st.markdown("### 🏆 Leaderboard")
+    leaderboard = get_leaderboard(sport_id)
+    sport_icons = {s['id']: s['icon'] for s in SPORTS}
+    
+    st.caption("🔥 Top markets • recent inflow")
+    if leaderboard['markets']:
+        for rank, m in enumerate(leaderboard['markets'], 1):
+            icon = sport_icons.get(m['sport_id'], "🎯")
+            st.markdown(f"{rank}. {icon} {m['event_name'][:22]} — **{format_stake(m['recent_in'])}**")
+    else:
+        st.markdown("*No market flow yet*")
+    
+    st.caption(f"{sport_info['icon']} Top competitions • net flow")
+    if leaderboard['competitions']:
+        for rank, c in enumerate(leaderboard['competitions'], 1):
+            st.markdown(f"{rank}. {c['name'][:22]} — **{format_stake(c['net'])}** (in {format_stake(c['total_in'])} / out {format_stake(c['total_out'])})")
+    else:
+        st.markdown("*No competition flow yet*")
+    
+    st.caption("📊 Sports • net flow")
+    for s in leaderboard['sports']:
+        icon = sport_icons.get(s['sport_id'], "🎯")
+        st.markdown(f"{icon} **{format_stake(s['net'])}** (in {format_stake(s['total_in'])} / out {format_stake(s['total_out'])})")
 
 with col1:
     st.markdown(f"### {sport_info['icon']} Live {sport_info['name']} Matches")
@@ -368,38 +575,42 @@ with col1:
                         leader = team1['name'] if team1['percentage'] > team2['percentage'] else team2['name']
                         st.info(f"📊 Match Load on **{leader}**")
                     
-                    # Display team stats with Total Bet and P/L
-                    cols = st.columns(len(runners))
-                    for idx, runner in enumerate(runners):
-                        with cols[idx]:
-                            name = runner.get('name', f'Team {idx+1}')
-                            back = runner.get('back', [{}])
-                            lay = runner.get('lay', [{}])
-                            bp = back[0].get('price', '-') if back else '-'
-                            bs = back[0].get('size', 0) if back else 0
-                            lp = lay[0].get('price', '-') if lay else '-'
-                            ls = lay[0].get('size', 0) if lay else 0
+                    # Multi-runner markets (racing): one ranked table instead of a column per runner
+                    if len(runners) > MULTI_RUNNER_THRESHOLD:
+                        st.dataframe(ranked_runner_rows(runners, market_load), hide_index=True, use_container_width=True)
+                    else:
+                        # Display team stats with Total Bet and P/L
+                        cols = st.columns(len(runners))
+                        for idx, runner in enumerate(runners):
+                            with cols[idx]:
+                                name = runner.get('name', f'Team {idx+1}')
+                                back = runner.get('back', [{}])
+                                lay = runner.get('lay', [{}])
+                                bp = back[0].get('price', '-') if back else '-'
+                                bs = back[0].get('size', 0) if back else 0
+                                lp = lay[0].get('price', '-') if lay else '-'
+                                ls = lay[0].get('size', 0) if lay else 0
                             
-                            # Get market load data for this runner
-                            load_data = market_load[idx] if idx < len(market_load) else None
-                            total_bet_display = format_stake(load_data['total_bet']) if load_data else "N/A"
-                            pl_display = format_stake(load_data['pl_if_win']) if load_data else "N/A"
-                            pl_color = "#10b981" if load_data and load_data['pl_if_win'] > 0 else "#ef4444"
+                                # Get market load data for this runner
+                                load_data = market_load[idx] if idx < len(market_load) else None
+                                total_bet_display = format_stake(load_data['total_bet']) if load_data else "N/A"
+                                pl_display = format_stake(load_data['pl_if_win']) if load_data else "N/A"
+                                pl_color = "#10b981" if load_data and load_data['pl_if_win'] > 0 else "#ef4444"
                             
-                            # Display odds using Streamlit native components
-                            st.markdown(f"**{name[:20]}**")
+                                # Display odds using Streamlit native components
+                                st.markdown(f"**{name[:20]}**")
                             
-                            ocol1, ocol2 = st.columns(2)
-                            with ocol1:
-                                st.metric("Back", bp, delta=f"₹{format_stake(bs)}", delta_color="normal")
-                            with ocol2:
-                                st.metric("Lay", lp, delta=f"₹{format_stake(ls)}", delta_color="inverse")
+                                ocol1, ocol2 = st.columns(2)
+                                with ocol1:
+                                    st.metric("Back", bp, delta=f"₹{format_stake(bs)}", delta_color="normal")
+                                with ocol2:
+                                    st.metric("Lay", lp, delta=f"₹{format_stake(ls)}", delta_color="inverse")
                             
-                            mcol1, mcol2 = st.columns(2)
-                            with mcol1:
-                                st.metric("Total Bet", total_bet_display)
-                            with mcol2:
-                                st.metric("P/L if Win", pl_display, delta_color="normal" if load_data and load_data['pl_if_win'] > 0 else "inverse")
+                                mcol1, mcol2 = st.columns(2)
+                                with mcol1:
+                                    st.metric("Total Bet", total_bet_display)
+                                with mcol2:
+                                    st.metric("P/L if Win", pl_display, delta_color="normal" if load_data and load_data['pl_if_win'] > 0 else "inverse")
                     
                     # Expandable Cumulative Tracking Section
                     with st.expander("💰 View Cumulative Money Flow Tracker", expanded=False):
@@ -407,32 +618,35 @@ with col1:
                         if cumulative_data:
                             st.markdown("#### Real-Time Money Movement (100ms precision)")
                             
-                            # Create columns for each team's cumulative data
-                            cum_cols = st.columns(len(cumulative_data))
-                            for idx, cum in enumerate(cumulative_data):
-                                with cum_cols[idx]:
-                                    st.markdown(f"**{cum['team'][:20]}**")
+                            if len(cumulative_data) > MULTI_RUNNER_THRESHOLD:
+                                st.dataframe(ranked_cumulative_rows(cumulative_data), hide_index=True, use_container_width=True)
+                            else:
+                                # Create columns for each team's cumulative data
+                                cum_cols = st.columns(len(cumulative_data))
+                                for idx, cum in enumerate(cumulative_data):
+                                    with cum_cols[idx]:
+                                        st.markdown(f"**{cum['team'][:20]}**")
                                     
-                                    # In flows
-                                    in_col1, in_col2 = st.columns(2)
-                                    with in_col1:
-                                        st.metric("💵 In (Back)", format_stake(cum['in_back']))
-                                    with in_col2:
-                                        st.metric("💵 In (Lay)", format_stake(cum['in_lay']))
+                                        # In flows
+                                        in_col1, in_col2 = st.columns(2)
+                                        with in_col1:
+                                            st.metric("💵 In (Back)", format_stake(cum['in_back']))
+                                        with in_col2:
+                                            st.metric("💵 In (Lay)", format_stake(cum['in_lay']))
                                     
-                                    # Out flows
-                                    out_col1, out_col2 = st.columns(2)
-                                    with out_col1:
-                                        st.metric("💸 Out (Back)", format_stake(cum['out_back']))
-                                    with out_col2:
-                                        st.metric("💸 Out (Lay)", format_stake(cum['out_lay']))
+                                        # Out flows
+                                        out_col1, out_col2 = st.columns(2)
+                                        with out_col1:
+                                            st.metric("💸 Out (Back)", format_stake(cum['out_back']))
+                                        with out_col2:
+                                            st.metric("💸 Out (Lay)", format_stake(cum['out_lay']))
                                     
-                                    # Net flows
-                                    net_col1, net_col2 = st.columns(2)
-                                    with net_col1:
-                                        st.metric("💰 Net Back", format_stake(cum['net_back']))
-                                    with net_col2:
-                                        st.metric("💰 Net Lay", format_stake(cum['net_lay']))
+                                        # Net flows
+                                        net_col1, net_col2 = st.columns(2)
+                                        with net_col1:
+                                            st.metric("💰 Net Back", format_stake(cum['net_back']))
+                                        with net_col2:
+                                            st.metric("💰 Net Lay", format_stake(cum['net_lay']))
                             
                             st.caption(f"📊 Last updated: {cumulative_data[0]['updated'][:19] if cumulative_data else 'N/A'} • Tracking at 100ms precision")
                         else:
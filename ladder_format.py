@@ -0,0 +1,323 @@
+"""
+Binary Ladder Snapshot Format
+Market ladder records shared by the tracker, dashboard and archives
+
+Record layout (little-endian, record_size(runner_count) bytes):
+
+    header     magic | version | runner_count | seq | market_id | timestamp
+    selections runner_count x 24-byte ASCII selection ids (NUL padded)
+    ladder     runner_count x (3 back + 3 lay) x (price, size) as float64
+
+Archives store records back to back at their own size. The ring gives
+each market its own SLOT_SIZE slot (room for MAX_RUNNERS), listed in a
+market_id directory after the ring header, so a market's latest record
+is found in O(1) and never overwritten by other markets.
+Empty levels are stored as price 0.0. Markets with more than MAX_RUNNERS
+runners are truncated.
+"""
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+
+MAGIC = b'LDR1'
+VERSION = 3
+MAX_RUNNERS = 32
+LEVELS = 3
+MARKET_ID_SIZE = 16
+SELECTION_ID_SIZE = 24  # any int64 as text, keeps the ladder 8-byte aligned
+
+# magic, version, runner_count, seq, market_id, timestamp
+HEADER = struct.Struct(f'<4sHHQ{MARKET_ID_SIZE}sd')
+RUNNER_VALUES = LEVELS * 2 * 2  # back + lay, (price, size) per level
+RUNNER_SIZE = SELECTION_ID_SIZE + RUNNER_VALUES * 8  # selection id + ladder values
+
+def record_size(runner_count):
+    return HEADER.size + runner_count * RUNNER_SIZE
+
+SLOT_SIZE = record_size(MAX_RUNNERS)
+
+# Ring file: magic, slot_count, slot_size, write_seq (padded so slots stay 8-byte aligned),
+# then slot_count x market_id directory entries, then the slots
+RING_MAGIC = b'LRB3'
+RING_HEADER = struct.Struct('<4sIIQ12x')
+RING_SLOTS = 1024  # concurrent markets; the least recently published is evicted when full
+WRITE_SEQ_OFFSET = 12
+RUNNER_COUNT_OFFSET = 6  # runner_count field inside a record header
+SEQ_OFFSET = 8  # seq field inside a record header
+
+def _selection_bytes(selection_id):
+    """Selection id as stored; ids that would not fit are rejected, not truncated"""
+    encoded = str(selection_id).encode('ascii')
+    if len(encoded) > SELECTION_ID_SIZE:
+        raise ValueError(f"Selection id too long for a ladder record: {selection_id}")
+    return encoded
+
+def pack_ladder_into(buf, offset, market_id, runners, timestamp=None, seq=0):
+    """Write one ladder record into buf at offset, returns the bytes written
+
+    runners: list of {'selection_id', 'back': [{'price', 'size'}], 'lay': [...]}
+    """
+    runners = runners[:MAX_RUNNERS]
+    count = len(runners)
+    selection_ids = [b''] * count
+    values = [0.0] * (count * RUNNER_VALUES)
+
+    for idx, runner in enumerate(runners):
+        selection_ids[idx] = _selection_bytes(runner.get('selection_id', ''))
+        base = idx * RUNNER_VALUES
+        for side_idx, side in enumerate(('back', 'lay')):
+            for level, quote in enumerate(runner.get(side, [])[:LEVELS]):
+                pos = base + (side_idx * LEVELS + level) * 2
+                values[pos] = float(quote.get('price') or 0.0)
+                values[pos + 1] = float(quote.get('size') or 0.0)
+
+    HEADER.pack_into(
+        buf, offset, MAGIC, VERSION, count, seq,
+        str(market_id).encode('ascii', 'ignore')[:MARKET_ID_SIZE],
+        time.time() if timestamp is None else timestamp
+    )
+    ladder_offset = offset + HEADER.size + count * SELECTION_ID_SIZE
+    struct.pack_into(f'<{count * SELECTION_ID_SIZE}s', buf, offset + HEADER.size,
+                     b''.join(sid.ljust(SELECTION_ID_SIZE, b'\0') for sid in selection_ids))
+    struct.pack_into(f'<{len(values)}d', buf, ladder_offset, *values)
+    return record_size(count)
+
+def encode_ladder(market_id, runners, timestamp=None, seq=0):
+    """Encode a ladder as a standalone record of record_size(runner_count) bytes"""
+    buf = bytearray(record_size(min(len(runners), MAX_RUNNERS)))
+    pack_ladder_into(buf, 0, market_id, runners, timestamp, seq)
+    return bytes(buf)
+
+class LadderView:
+    """Zero-copy view over one encoded record
+
+    Reads go straight to the underlying buffer (bytes, mmap or archive file),
+    no parsing happens until a field is accessed.
+    """
+
+    def __init__(self, buf, offset=0):
+        magic, version, self.runner_count, self.seq, market_id, self.timestamp = HEADER.unpack_from(buf, offset)
+        if magic != MAGIC or version != VERSION or self.runner_count > MAX_RUNNERS:
+            raise ValueError("Not a ladder record")
+        self.size = record_size(self.runner_count)
+        self.record = memoryview(buf)[offset:offset + self.size]
+        if len(self.record) != self.size:
+            self.record.release()
+            raise ValueError("Truncated ladder record")
+        self.market_id = market_id.rstrip(b'\0').decode('ascii')
+        ladder_offset = HEADER.size + self.runner_count * SELECTION_ID_SIZE
+        self.selection_ids = self.record[HEADER.size:ladder_offset]
+        self.values = self.record[ladder_offset:].cast('d')
+
+    def selection_id(self, runner):
+        """Selection id of runner index, as the string the feed sent"""
+        start = runner * SELECTION_ID_SIZE
+        return bytes(self.selection_ids[start:start + SELECTION_ID_SIZE]).rstrip(b'\0').decode('ascii')
+
+    def level(self, runner, side, depth=0):
+        """(price, size) for runner index, side 'back'/'lay', depth 0-2"""
+        pos = runner * RUNNER_VALUES + ((0 if side == 'back' else LEVELS) + depth) * 2
+        return self.values[pos], self.values[pos + 1]
+
+    def runners(self):
+        """Decode into the runner dicts used by the parsers (copies values)"""
+        runners = []
+        for idx in range(self.runner_count):
+            runner = {'selection_id': self.selection_id(idx), 'back': [], 'lay': []}
+            for side in ('back', 'lay'):
+                for depth in range(LEVELS):
+                    price, size = self.level(idx, side, depth)
+                    if price:
+                        runner[side].append({'price': price, 'size': size})
+            runners.append(runner)
+        return runners
+
+    def release(self):
+        self.selection_ids.release()
+        self.values.release()
+        self.record.release()
+
+class LadderRing:
+    """Shared mmap ladder ring with one slot per market
+
+    One writer (background tracker) publishes snapshots, any number of
+    readers (dashboard sessions) look up the latest ladder per market
+    through the market_id directory. A slot's seq is zeroed while it is
+    being rewritten, so readers can detect and retry torn records.
+    """
+
+    def __init__(self, path, writer=False, slots=RING_SLOTS):
+        self.path = Path(path)
+        self.writer = writer
+
+        if writer:
+            # Never truncate a ring readers may have mapped, swap in a new file instead
+            if not self._compatible(slots):
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'wb') as f:
+                    f.write(RING_HEADER.pack(RING_MAGIC, slots, SLOT_SIZE, 0))
+                    f.truncate(self._file_size(slots))
+                os.replace(tmp_path, self.path)
+            self.file = open(self.path, 'r+b')
+            self.buf = mmap.mmap(self.file.fileno(), self._file_size(slots))
+        else:
+            self.file = open(self.path, 'rb')
+            self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, slots, slot_size, _ = RING_HEADER.unpack_from(self.buf, 0)
+            if magic != RING_MAGIC or slot_size != SLOT_SIZE or len(self.buf) != self._file_size(slots):
+                self.close()
+                raise ValueError(f"Incompatible ladder ring: {self.path}")
+        self.slots = slots
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        # market_id key -> slot; the writer's copy is authoritative, readers' is a hint
+        self.index = {}
+        for slot in range(slots):
+            key = self._directory_key(slot)
+            if key.strip(b'\0'):
+                self.index[key] = slot
+
+    @staticmethod
+    def _file_size(slots):
+        return RING_HEADER.size + slots * (MARKET_ID_SIZE + SLOT_SIZE)
+
+    @staticmethod
+    def _key(market_id):
+        return str(market_id).encode('ascii', 'ignore')[:MARKET_ID_SIZE].ljust(MARKET_ID_SIZE, b'\0')
+
+    def _compatible(self, slots):
+        """True when an existing ring file can be reused by the writer as is"""
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(RING_HEADER.size)
+                size_ok = f.seek(0, 2) == self._file_size(slots)
+        except FileNotFoundError:
+            return False
+        if len(header) != RING_HEADER.size or not size_ok:
+            return False
+        magic, slot_count, slot_size, _ = RING_HEADER.unpack(header)
+        return magic == RING_MAGIC and slot_count == slots and slot_size == SLOT_SIZE
+
+    def is_stale(self):
+        """True once the writer has replaced the ring file (readers should reopen)"""
+        try:
+            return self.path.stat().st_ino != self.inode
+        except FileNotFoundError:
+            return True
+
+    def _directory_offset(self, slot):
+        return RING_HEADER.size + slot * MARKET_ID_SIZE
+
+    def _directory_key(self, slot):
+        offset = self._directory_offset(slot)
+        return bytes(self.buf[offset:offset + MARKET_ID_SIZE])
+
+    def _slot_offset(self, slot):
+        return RING_HEADER.size + self.slots * MARKET_ID_SIZE + slot * SLOT_SIZE
+
+    def write_seq(self):
+        return struct.unpack_from('<Q', self.buf, WRITE_SEQ_OFFSET)[0]
+
+    def _assign_slot(self, key):
+        """Slot for a market new to the ring: a free one, else the least recently published"""
+        used = set(self.index.values())
+        free = next((slot for slot in range(self.slots) if slot not in used), None)
+        if free is None:
+            free = min(range(self.slots), key=lambda slot: HEADER.unpack_from(self.buf, self._slot_offset(slot))[5])
+            self.index.pop(self._directory_key(free), None)
+        self.index[key] = free
+        return free
+
+    def publish(self, market_id, runners, timestamp=None):
+        """Overwrite the market's slot with a snapshot and return its sequence number"""
+        key = self._key(market_id)
+        slot = self.index.get(key)
+        if slot is None:
+            slot = self._assign_slot(key)
+        seq = self.write_seq() + 1
+        offset = self._slot_offset(slot)
+        struct.pack_into('<Q', self.buf, offset + SEQ_OFFSET, 0)
+        pack_ladder_into(self.buf, offset, market_id, runners, timestamp, seq=0)
+        self.buf[self._directory_offset(slot):self._directory_offset(slot) + MARKET_ID_SIZE] = key
+        struct.pack_into('<Q', self.buf, offset + SEQ_OFFSET, seq)
+        struct.pack_into('<Q', self.buf, WRITE_SEQ_OFFSET, seq)
+        return seq
+
+    def _find_slot(self, key):
+        """Slot holding key according to the directory, or None"""
+        slot = self.index.get(key)
+        if slot is not None and self._directory_key(slot) == key:
+            return slot
+        start = self._directory_offset(0)
+        end = self._directory_offset(self.slots)
+        pos = self.buf.find(key, start, end)
+        while pos != -1 and (pos - start) % MARKET_ID_SIZE:
+            pos = self.buf.find(key, pos + 1, end)
+        if pos == -1:
+            self.index.pop(key, None)
+            return None
+        slot = (pos - start) // MARKET_ID_SIZE
+        self.index[key] = slot
+        return slot
+
+    def latest(self, market_id, max_age=None, attempts=3):
+        """Decoded runners of the newest snapshot for market_id, or None"""
+        key = self._key(market_id)
+        slot = self._find_slot(key)
+        if slot is None:
+            return None
+        offset = self._slot_offset(slot)
+        for _ in range(attempts):
+            _, _, _, seq, slot_market, timestamp = HEADER.unpack_from(self.buf, offset)
+            if seq == 0:  # writer mid-update
+                continue
+            if slot_market != key:  # slot was handed to another market
+                return None
+            if max_age is not None and time.time() - timestamp > max_age:
+                return None
+            try:
+                view = LadderView(self.buf, offset)
+                try:
+                    runners = view.runners()
+                finally:
+                    view.release()
+            except ValueError:  # slot rewritten under us, the seq check below would fail anyway
+                continue
+            # Writer rewrote the slot while we were decoding
+            if struct.unpack_from('<Q', self.buf, offset + SEQ_OFFSET)[0] != seq:
+                continue
+            return {'market_id': str(market_id), 'timestamp': timestamp, 'runners': runners}
+        return None
+
+    def close(self):
+        self.buf.close()
+        self.file.close()
+
+def append_archive(path, market_id, runners, timestamp=None):
+    """Append one snapshot to an archive file of back-to-back variable-size records"""
+    with open(path, 'ab') as f:
+        f.write(encode_ladder(market_id, runners, timestamp))
+
+def iter_archive(path):
+    """Yield a LadderView per record in an archive file (mmap, zero-copy)
+
+    Views borrow the mapping; call release() on any view kept past the
+    next iteration.
+    """
+    with open(path, 'rb') as f:
+        if not f.seek(0, 2):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offset = 0
+            while offset + HEADER.size <= len(buf):
+                runner_count = struct.unpack_from('<H', buf, offset + RUNNER_COUNT_OFFSET)[0]
+                # Stop at a record cut short by a crash mid-append
+                if offset + record_size(runner_count) > len(buf):
+                    break
+                view = LadderView(buf, offset)
+                try:
+                    yield view
+                finally:
+                    view.release()
+                offset += record_size(runner_count)
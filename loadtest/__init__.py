@@ -0,0 +1 @@
+"""Load-testing harness for the tracker and dashboard"""
@@ -0,0 +1,194 @@
+"""
+Fake Exchange - local stand-in for the events and odds APIs
+Serves event_list, getMarketDataNew and a market runners lookup with configurable load
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SPORTS = [4, 1, 2, 7]  # Cricket, Soccer, Tennis, Horse Racing
+EVENTS_PATH = "/api/guest/event_list"
+ODDS_PATH = "/ws/getMarketDataNew"
+RUNNERS_PATH = "/api/guest/market_runners"
+
+class FakeMarket:
+    """One market whose ladder random-walks at tick_rate ticks per second"""
+
+    def __init__(self, idx, sport_id, runners, tick_rate, rng):
+        self.market_id = f"1.{300000000 + idx}"
+        self.competition = f"Load League {idx % 5}"
+        self.sport_id = sport_id
+        self.tick_rate = tick_rate
+        self.rng = rng
+        self.lock = threading.Lock()
+        self.last_tick = time.time()
+
+        if runners == 2:
+            self.name = f"Load Team A{idx} v Load Team B{idx}"
+        else:
+            self.name = f"Load Race {idx}"
+        self.selection_ids = [str(10000 + idx * 100 + k) for k in range(runners)]
+        # runner -> [back1, back2, back3, lay1, lay2, lay3] as [price, size]
+        self.ladder = []
+        for k in range(runners):
+            price = round(1.5 + k * 1.7, 2)
+            self.ladder.append([[price - 0.01 * d, rng.uniform(100, 50000)] for d in range(3)] +
+                               [[price + 0.01 * (d + 1), rng.uniform(100, 50000)] for d in range(3)])
+
+    def event(self):
+        return {
+            "market_id": self.market_id,
+            "name": self.name,
+            "event_type_id": self.sport_id,
+            "competition_name": self.competition,
+            "in_play": 1,
+        }
+
+    def runners(self):
+        return [{"selection_id": sel, "runner_name": f"Runner {k + 1}"}
+                for k, sel in enumerate(self.selection_ids)]
+
+    def advance(self):
+        """Apply the ticks due since the last request"""
+        now = time.time()
+        ticks = int((now - self.last_tick) * self.tick_rate)
+        if ticks <= 0:
+            return
+        self.last_tick = now
+        for _ in range(min(ticks, 50)):
+            level = self.rng.choice(self.rng.choice(self.ladder))
+            level[1] = max(0.0, level[1] + self.rng.uniform(-2000, 2500))
+
+    def odds_str(self):
+        with self.lock:
+            self.advance()
+            parts = [self.market_id, "", "OPEN", "0", "", "18865406.68", "7074890786", str(int(time.time()))]
+            for sel, levels in zip(self.selection_ids, self.ladder):
+                parts += [sel, "ACTIVE"]
+                for price, size in levels:
+                    parts += [f"{price:.2f}", f"{size:.2f}"]
+            return "|".join(parts)
+
+class FakeExchange:
+    """Threaded HTTP server exposing the two exchange endpoints"""
+
+    def __init__(self, markets=50, runners=2, racing_runners=12, tick_rate=5.0,
+                 latency=0.0, host="127.0.0.1", port=0, seed=1):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.markets = {}
+        for idx in range(markets):
+            sport_id = SPORTS[idx % len(SPORTS)]
+            count = racing_runners if sport_id == 7 else runners
+            market = FakeMarket(idx, sport_id, count, tick_rate, random.Random(rng.random()))
+            self.markets[market.market_id] = market
+        self.counters = {'events': 0, 'odds': 0, 'runners': 0}
+        self.counter_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def events_api(self):
+        return self.base_url + EVENTS_PATH
+
+    @property
+    def odds_api(self):
+        return self.base_url + ODDS_PATH
+
+    @property
+    def runners_api(self):
+        return self.base_url + RUNNERS_PATH
+
+    def count(self, key):
+        with self.counter_lock:
+            self.counters[key] += 1
+
+    def _handler(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload):
+                if exchange.latency:
+                    time.sleep(exchange.latency)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == RUNNERS_PATH:
+                    exchange.count('runners')
+                    market = exchange.markets.get(query.get("market_id", [""])[0])
+                    self._send_json({"data": {"runners": market.runners() if market else []}})
+                    return
+                if url.path != EVENTS_PATH:
+                    self.send_error(404)
+                    return
+                exchange.count('events')
+                sport_id = int(query.get("sport_id", ["4"])[0])
+                events = [m.event() for m in exchange.markets.values() if m.sport_id == sport_id]
+                self._send_json({"data": {"events": events}})
+
+            def do_POST(self):
+                if urlparse(self.path).path != ODDS_PATH:
+                    self.send_error(404)
+                    return
+                exchange.count('odds')
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                market_ids = form.get("market_ids[]", [])
+                self._send_json([exchange.markets[m].odds_str() if m in exchange.markets else None
+                                 for m in market_ids])
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake exchange for load testing")
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--runners", type=int, default=2, help="runners per non-racing market")
+    parser.add_argument("--racing-runners", type=int, default=12)
+    parser.add_argument("--tick-rate", type=float, default=5.0, help="ladder ticks per second per market")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    exchange = FakeExchange(args.markets, args.runners, args.racing_runners, args.tick_rate,
+                            args.latency, port=args.port).start()
+    print(f"🧪 Fake exchange with {args.markets} markets on {exchange.base_url}")
+    print(f"   EVENTS_API={exchange.events_api}")
+    print(f"   ODDS_API={exchange.odds_api}")
+    print(f"   RUNNERS_API={exchange.runners_api}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        exchange.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Load Test Runner
+Drives background_tracker.py and headless dashboard viewers against the fake exchange
+
+    python -m loadtest.run --markets 10 50 200 --viewers 0 5 20 --duration 30
+
+Each scenario gets a fresh fake exchange and database. Metrics cover only
+the measured window, which opens once every viewer is rendering (after
+the tracker warmup and Streamlit start-up) and lasts --duration. Results are written
+to loadtest/results.json and compared against loadtest/baseline.json when
+one exists (--update-baseline replaces it).
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import queue
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+from loadtest.fake_exchange import FakeExchange
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_PATH = Path(__file__).resolve().parent / 'results.json'
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+# Status line printed by background_tracker.py every STATS_INTERVAL seconds
+POLL_LINE = re.compile(r"Poll #(\d+) \| (\d+) matches \| cycle (\d+)ms avg / (\d+)ms max \| (\d+) rows/s")
+LOCK_ERROR = "database is locked"
+
+# Metrics shown in the baseline comparison, (section, key)
+COMPARED_METRICS = [
+    ('tracker', 'cycle_ms_avg'),
+    ('tracker', 'cycle_ms_max'),
+    ('tracker', 'rows_per_s'),
+    ('tracker', 'lock_errors'),
+    ('dashboard', 'render_ms_p50'),
+    ('dashboard', 'render_ms_p95'),
+    ('dashboard', 'lock_errors'),
+    ('exchange', 'odds_requests_per_s'),
+]
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class TrackerDriver:
+    """Runs background_tracker.py as a subprocess and parses its status lines"""
+
+    def __init__(self, env):
+        self.samples = []
+        self.lock_errors = []  # timestamps
+        self.errors = []
+        self.last_sample = time.time()
+        self.proc = subprocess.Popen(
+            [sys.executable, '-u', str(ROOT / 'background_tracker.py')],
+            cwd=ROOT, env=env, text=True,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            now = time.time()
+            match = POLL_LINE.search(line)
+            if match:
+                _, markets, avg_ms, max_ms, rows_per_s = map(int, match.groups())
+                # Each status line covers the time since the previous one
+                self.samples.append({'start': self.last_sample, 'end': now, 'markets': markets,
+                                     'cycle_ms_avg': avg_ms, 'cycle_ms_max': max_ms,
+                                     'rows_per_s': rows_per_s})
+                self.last_sample = now
+            elif LOCK_ERROR in line:
+                self.lock_errors.append(now)
+            elif '❌' in line:
+                self.errors.append(now)
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.thread.join(timeout=5)
+
+    def summary(self, start, end):
+        """Metrics from the status windows that fall entirely within [start, end]"""
+        samples = [s for s in self.samples if s['start'] >= start and s['end'] <= end]
+        return {
+            'markets_tracked': max((s['markets'] for s in samples), default=0),
+            'cycle_ms_avg': round(statistics.mean(s['cycle_ms_avg'] for s in samples), 1) if samples else None,
+            'cycle_ms_max': max((s['cycle_ms_max'] for s in samples), default=None),
+            'rows_per_s': round(statistics.mean(s['rows_per_s'] for s in samples), 1) if samples else None,
+            'lock_errors': sum(start <= t <= end for t in self.lock_errors),
+            'errors': sum(start <= t <= end for t in self.errors),
+            'windows': len(samples),
+        }
+
+def run_viewer(env, duration, ready, go, results):
+    """One headless dashboard client: re-renders the app for duration once told to go"""
+    os.environ.update(env)
+    sys.path.insert(0, str(ROOT))
+    from streamlit.testing.v1 import AppTest
+
+    latencies = []
+    errors = 0
+    log = io.StringIO()
+    app = AppTest.from_file(str(ROOT / 'dashboard.py'), default_timeout=120)
+    ready.put(os.getpid())
+    go.wait()
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(log), redirect_stderr(log):
+                app.run()
+            if app.exception:
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put({'latencies': latencies, 'errors': errors,
+                 'lock_errors': log.getvalue().count(LOCK_ERROR)})
+
+def run_scenario(markets, viewers, args):
+    """Run tracker (+ viewers) against a fresh exchange and collect metrics"""
+    print(f"▶️  {markets} markets, {viewers} viewers")
+    exchange = FakeExchange(markets, args.runners, args.racing_runners, args.tick_rate, args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='loadtest-') as tmp:
+            env = dict(os.environ,
+                       TRACKER_DB=str(Path(tmp) / 'tracker.db'),
+                       EVENTS_API=exchange.events_api,
+                       ODDS_API=exchange.odds_api,
+                       RUNNERS_API=exchange.runners_api,
+                       STREAMLIT_BROWSER_GATHER_USAGE_STATS='false')
+            tracker = TrackerDriver(env)
+            procs = []
+            try:
+                time.sleep(args.warmup)
+
+                ctx = multiprocessing.get_context('spawn')
+                ready, go, results = ctx.Queue(), ctx.Event(), ctx.Queue()
+                procs = [ctx.Process(target=run_viewer, args=(env, args.duration, ready, go, results))
+                         for _ in range(viewers)]
+                for proc in procs:
+                    proc.start()
+                # Viewers take seconds to spawn and import Streamlit; measure once all are running
+                started_viewers = 0
+                try:
+                    for _ in procs:
+                        ready.get(timeout=300)
+                        started_viewers += 1
+                except queue.Empty:
+                    print(f"⚠️ {len(procs) - started_viewers} viewers did not start")
+                go.set()
+
+                started = time.time()
+                odds_before = exchange.counters['odds']
+                time.sleep(args.duration)
+                ended = time.time()
+                odds_requests = exchange.counters['odds'] - odds_before
+
+                viewer_results = []
+                if procs:
+                    deadline = ended + 300
+                    try:
+                        for _ in procs:
+                            viewer_results.append(results.get(timeout=max(1, deadline - time.time())))
+                    except queue.Empty:
+                        print(f"⚠️ {len(procs) - len(viewer_results)} viewers did not report")
+            finally:
+                # Never leave viewers or background_tracker.py running, whatever failed
+                for proc in procs:
+                    if proc.pid is None:  # never started
+                        continue
+                    if proc.is_alive():
+                        proc.terminate()
+                    proc.join(timeout=30)
+                tracker.stop()
+    finally:
+        exchange.stop()
+
+    summary = tracker.summary(started, ended)
+    if not summary['windows']:
+        print("⚠️ No tracker status window fell inside the measured span, increase --duration")
+    latencies = [ms for r in viewer_results for ms in r['latencies']]
+    return {
+        'markets': markets,
+        'viewers': viewers,
+        'tracker': summary,
+        'dashboard': {
+            'renders': len(latencies),
+            'render_ms_p50': round(percentile(latencies, 50), 1) if latencies else None,
+            'render_ms_p95': round(percentile(latencies, 95), 1) if latencies else None,
+            'render_ms_max': round(max(latencies), 1) if latencies else None,
+            'errors': sum(r['errors'] for r in viewer_results),
+            'lock_errors': sum(r['lock_errors'] for r in viewer_results),
+            'missing_viewers': viewers - len(viewer_results),
+        },
+        'exchange': {
+            'odds_requests_per_s': round(odds_requests / (ended - started), 1),
+        },
+    }
+
+def compare(results, baseline):
+    """Print each scenario's metrics next to the matching baseline scenario"""
+    previous = {(s['markets'], s['viewers']): s for s in baseline.get('scenarios', [])}
+    for scenario in results['scenarios']:
+        old = previous.get((scenario['markets'], scenario['viewers']))
+        print(f"\n📊 {scenario['markets']} markets, {scenario['viewers']} viewers")
+        for section, key in COMPARED_METRICS:
+            label = f"{section}.{key}"
+            new_value = scenario[section].get(key)
+            old_value = old[section].get(key) if old else None
+            if old_value is None or new_value is None:
+                print(f"   {label:<30} {new_value}")
+            elif old_value:
+                change = (new_value - old_value) / old_value * 100
+                print(f"   {label:<30} {old_value} → {new_value} ({change:+.0f}%)")
+            else:
+                print(f"   {label:<30} {old_value} → {new_value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the tracker and dashboard against a fake exchange")
+    parser.add_argument("--markets", type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument("--viewers", type=int, nargs='+', default=[0, 5])
+    parser.add_argument("--runners", type=int, default=2, help="runners per non-racing market")
+    parser.add_argument("--racing-runners", type=int, default=12)
+    parser.add_argument("--tick-rate", type=float, default=5.0, help="ladder ticks per second per market")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every exchange response")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=6, help="seconds for the tracker to seed every market")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'config': {key: getattr(args, key) for key in
+                   ('runners', 'racing_runners', 'tick_rate', 'latency', 'duration', 'warmup')},
+        'scenarios': [run_scenario(markets, viewers, args)
+                      for markets in args.markets for viewers in args.viewers],
+    }
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"💾 Results: {args.output}")
+
+    compare(results, json.loads(args.baseline.read_text()) if args.baseline.exists() else {})
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"💾 Baseline updated: {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Tracker Configuration
+Polling profiles, watchlist and exclusions, hot-reloaded when the files change
+
+Example data/tracker_config.json:
+
+    {
+        "poll_interval": 0.5,
+        "profiles": {"fast": 0.1, "normal": 0.5, "slow": 2.0},
+        "sport_profiles": {"4": "fast", "7": "slow"},
+        "market_profiles": {"1.252151159": "fast"},
+        "exclude_sports": [2],
+        "exclude_competitions": ["Virtual Cricket"],
+        "max_markets": 100
+    }
+
+Profile entries take a defined profile name or a number of seconds. A
+file with a wrongly typed key is rejected as a whole. Markets listed
+in data/watchlist.txt (one id per line) are always tracked, ignore
+exclusions and the cap, and poll at the fastest configured interval.
+
+Environment variables (POLL_INTERVAL, SPORTS_TO_TRACK, MAX_MARKETS) set the
+deploy-time defaults; the config file overrides them while running.
+"""
+import json
+import math
+import os
+from pathlib import Path
+
+CONFIG_KEYS = {
+    'poll_interval', 'sports', 'profiles', 'sport_profiles', 'market_profiles',
+    'exclude_sports', 'exclude_competitions', 'max_markets',
+}
+
+def to_seconds(value, settings):
+    """Profile name or number of seconds -> seconds"""
+    if isinstance(value, str):
+        value = settings['profiles'][value]
+    return float(value)
+
+def polling_intervals(settings):
+    """Every interval the settings can poll at"""
+    intervals = [float(settings['poll_interval'])]
+    for key in ('profiles', 'sport_profiles', 'market_profiles'):
+        intervals += [to_seconds(v, settings) for v in settings[key].values()]
+    return intervals
+
+def validate_settings(settings):
+    """Raise ValueError unless every key has the expected type"""
+    def is_number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    if not is_number(settings['poll_interval']):
+        raise ValueError("poll_interval must be a number of seconds")
+    for key in ('sports', 'exclude_sports'):
+        if not isinstance(settings[key], list) or not all(is_int(s) for s in settings[key]):
+            raise ValueError(f"{key} must be a list of sport ids")
+    competitions = settings['exclude_competitions']
+    if not isinstance(competitions, list) or not all(isinstance(c, str) for c in competitions):
+        raise ValueError("exclude_competitions must be a list of competition names")
+    if not is_int(settings['max_markets']) or settings['max_markets'] < 0:
+        raise ValueError("max_markets must be a non-negative integer")
+
+    for key in ('profiles', 'sport_profiles', 'market_profiles'):
+        if not isinstance(settings[key], dict):
+            raise ValueError(f"{key} must be an object")
+    for name, seconds in settings['profiles'].items():
+        if not is_number(seconds):
+            raise ValueError(f"profile '{name}' must be a number of seconds")
+    for key in ('sport_profiles', 'market_profiles'):
+        for target, value in settings[key].items():
+            if isinstance(value, str):
+                if value not in settings['profiles']:
+                    raise ValueError(f"{key}[{target}] references unknown profile '{value}'")
+            elif not is_number(value):
+                raise ValueError(f"{key}[{target}] must be a profile name or seconds")
+
+    if min(polling_intervals(settings)) <= 0:
+        raise ValueError("polling intervals must be positive")
+
+# Environment overrides: (setting, variable, parser)
+ENV_SETTINGS = [
+    ('poll_interval', 'POLL_INTERVAL', float),
+    ('sports', 'SPORTS_TO_TRACK', lambda raw: [int(s) for s in raw.split(',') if s.strip()]),
+    ('max_markets', 'MAX_MARKETS', int),
+]
+
+def env_defaults(poll_interval, sports):
+    """Defaults from code, overridden by environment variables
+
+    Each variable is validated like the config file; an invalid one is
+    ignored and the code default kept.
+    """
+    config = {
+        'poll_interval': poll_interval,
+        'sports': list(sports),
+        'profiles': {},
+        'sport_profiles': {},
+        'market_profiles': {},
+        'exclude_sports': [],
+        'exclude_competitions': [],
+        'max_markets': 0,
+    }
+    for key, env_name, parse in ENV_SETTINGS:
+        raw = os.environ.get(env_name)
+        if not raw:
+            continue
+        try:
+            candidate = dict(config, **{key: parse(raw)})
+            validate_settings(candidate)
+            config = candidate
+        except ValueError as e:
+            print(f"⚠️ Ignoring invalid tracker environment setting {env_name}={raw!r}: {e}")
+    return config
+
+def file_mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def read_watchlist(path):
+    """Market ids from the watchlist file, one per line ('#' starts a comment)"""
+    market_ids = set()
+    for line in path.read_text().splitlines():
+        market_id = line.split('#', 1)[0].strip()
+        if market_id:
+            market_ids.add(market_id)
+    return market_ids
+
+class TrackerConfig:
+    """Live tracker settings, re-read whenever the config or watchlist file changes"""
+
+    def __init__(self, config_path, watchlist_path, poll_interval=0.1, sports=(4, 1, 2, 7)):
+        self.config_path = Path(config_path)
+        self.watchlist_path = Path(watchlist_path)
+        self.defaults = env_defaults(poll_interval, sports)
+        self.settings = dict(self.defaults)
+        self.watchlist = set()
+        self.mtimes = (None, None)
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """Re-read changed files; returns True when anything was reloaded"""
+        mtimes = (file_mtime(self.config_path), file_mtime(self.watchlist_path))
+        if mtimes == self.mtimes:
+            return False
+
+        if mtimes[0] != self.mtimes[0]:
+            self._load_config(mtimes[0] is not None)
+        if mtimes[1] != self.mtimes[1]:
+            try:
+                self.watchlist = read_watchlist(self.watchlist_path) if mtimes[1] is not None else set()
+            except OSError as e:
+                print(f"⚠️ Could not read watchlist {self.watchlist_path}: {e}")
+        self.mtimes = mtimes
+        print(f"⚙️  Config loaded | every {self.settings['poll_interval']}s | "
+              f"sports {self.sports} | {len(self.watchlist)} watchlisted | "
+              f"cap {self.settings['max_markets'] or 'none'}")
+        return True
+
+    def _load_config(self, exists):
+        if not exists:
+            self.settings = dict(self.defaults)
+            return
+        try:
+            loaded = json.loads(self.config_path.read_text())
+            unknown = set(loaded) - CONFIG_KEYS
+            if unknown:
+                print(f"⚠️ Unknown config keys ignored: {', '.join(sorted(unknown))}")
+            settings = dict(self.defaults)
+            settings.update({k: v for k, v in loaded.items() if k in CONFIG_KEYS})
+            # Validate before swapping in, so a bad edit keeps the last good config
+            validate_settings(settings)
+            self.settings = settings
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"❌ Config error in {self.config_path}, keeping previous settings: {e}")
+
+    @property
+    def sports(self):
+        excluded = set(self.settings['exclude_sports'])
+        return [s for s in self.settings['sports'] if s not in excluded]
+
+    @property
+    def fastest_interval(self):
+        return min(polling_intervals(self.settings))
+
+    def interval_for(self, market_id, sport_id):
+        """Polling interval for a market: watchlist > market > sport > default"""
+        if market_id in self.watchlist:
+            return self.fastest_interval
+        if market_id in self.settings['market_profiles']:
+            return to_seconds(self.settings['market_profiles'][market_id], self.settings)
+        if str(sport_id) in self.settings['sport_profiles']:
+            return to_seconds(self.settings['sport_profiles'][str(sport_id)], self.settings)
+        return float(self.settings['poll_interval'])
+
+    def is_excluded(self, market_id, sport_id, competition):
+        if market_id in self.watchlist:
+            return False
+        # The feed may send sport ids as strings
+        if str(sport_id) in {str(s) for s in self.settings['exclude_sports']}:
+            return True
+        return competition in self.settings['exclude_competitions']
+
+    def select_markets(self, markets):
+        """Apply exclusions and the market cap to market dicts
+
+        Each dict needs market_id, sport_id and competition. Over the cap,
+        watchlisted markets are kept first, then the fastest-polled ones.
+        """
+        selected = [m for m in markets
+                    if not self.is_excluded(m['market_id'], m['sport_id'], m['competition'])]
+        max_markets = self.settings['max_markets']
+        if max_markets and len(selected) > max_markets:
+            selected.sort(key=lambda m: (m['market_id'] not in self.watchlist,
+                                         self.interval_for(m['market_id'], m['sport_id'])))
+            pinned = [m for m in selected if m['market_id'] in self.watchlist]
+            selected = pinned + selected[len(pinned):max_markets]
+        return selected